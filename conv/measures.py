@@ -1,5 +1,7 @@
 """Helper functions for computing any derived measures of interest during conversion."""
 
+import numpy as np
+
 ###################################################################################################
 ###################################################################################################
 
@@ -16,3 +18,33 @@ def compute_error():
     ...
 
     return error
+
+
+def compute_speed(positions, times):
+    """Compute speed across a series of positions.
+
+    Parameters
+    ----------
+    positions : 2d array
+        Position values, with shape (2, n_samples).
+    times : 1d array
+        Timestamps of the position values.
+
+    Returns
+    -------
+    speed : 1d array
+        Speed values, in position units per time unit, with the first sample set as 0.
+
+    Notes
+    -----
+    Speed is set as 0 for any samples with a repeated timestamp.
+    """
+
+    dpos = np.diff(positions, axis=1)
+    dist = np.hypot(dpos[0], dpos[1])
+    dtime = np.diff(times)
+
+    speed = np.zeros(len(times))
+    np.divide(dist, dtime, out=speed[1:], where=dtime > 0)
+
+    return speed
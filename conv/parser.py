@@ -1,5 +1,7 @@
 """Functions for parsing log files."""
 
+import numpy as np
+
 # Import local code
 from conv.task import Task
 from conv.process import process_task
@@ -8,6 +10,11 @@ from conv.utils import print_status
 ###################################################################################################
 ###################################################################################################
 
+# Define the data types of the columns of the sync file
+#   This should be edited to match the sync file format (e.g. float times if they have decimals)
+SYNC_DTYPE = [('time', np.int64), ('frame', np.int64), ('on_off', np.int8)]
+
+
 def process_session(paths, process=False, task=None, verbose=True):
     """Process a session of data.
 
@@ -65,49 +72,47 @@ def parse_lines_log(file_path, task=None, verbose=True):
         task = Task()
 
     # Define flags, with start values, for tracking current status
+    #   This includes running counters of task information
     flags = {'task_phase': {...},
+             'trial_counter': 0,
              }
 
-    # Running counters of task information
-    trial_counter = 0
+    # Bind the handler lookup locally, for use in the loop
+    get_handler = EVENT_HANDLERS.get
 
     # Loop across all lines in log file and collect information
-    with open(file_path, 'r') as fobj:
+    with open(file_path, 'r', buffering=65536) as fobj:
 
-        #  Get the start & end times of the session, and count number of lines
-        lines = fobj.readlines()
-        task.session['start_time'] = lines[0].split('\t')[0]
-        task.session['end_time'] = lines[-1].split('\t')[0]
-        n_lines = len(lines)
-
-        # Reset file object to the start of the file
+        # Get the start time of the session, from the first line of the file
+        task.session['start_time'] = fobj.readline().split('\t', 1)[0]
         fobj.seek(0)
 
-        for ix, line in enumerate(fobj.readlines()):
+        for ix, line in enumerate(fobj):
 
             # ------ SETUP ------
-            line = line.replace('\r', '')
-            tokens = line[:-1].split('\t')
+            line = line.rstrip('\r\n')
+
+            # Find the column boundaries of the consistent variables: time, frame, event, subevent
+            t1 = line.find('\t')
+            t2 = line.find('\t', t1 + 1)
+            t3 = line.find('\t', t2 + 1)
 
             # Check for lines that seem to have an issue
-            if len(tokens) <= 3:
+            if t1 < 0 or t2 < 0 or t3 < 0:
                 print('Unexpected line length at line {}'.format(ix))
                 continue
 
-            # Parse consistent variables
-            time = tokens[0]
-            frame = tokens[1]
-            event = tokens[2]
-            subevent = tokens[3]
-
-            ## ------ WORDS WORDS WORDS ------
-            if event == 'THINGS':
-                ...
+            # Select the event handler for the current event, and
+            #   only split the full line for events that have a handler
+            handler = get_handler(line[t2 + 1:t3])
+            if handler is not None:
 
-            ## ------ WORDS WORDS WORDS ------
-            if event == 'THINGS':
-                ...
+                # Split out the consistent variables, leaving any remaining columns unsplit
+                tokens = line.split('\t', 4)
+                handler(tokens, task, flags)
 
+        # Get the end time of the session, from the last line of the file
+        task.session['end_time'] = line.split('\t', 1)[0]
 
     return task
 
@@ -132,15 +137,46 @@ def parse_lines_sync(file_path, task=None, verbose=True):
     if not Task:
         task = Task()
 
-    with open(file_path, 'r') as fobj:
-        for ix, line in enumerate(fobj.readlines()):
+    # This is one possibility of what it looks like: EEGlog file
+    #   Columns are loaded directly into typed arrays, rather than looping across lines
+    with open(file_path, 'r', buffering=65536) as fobj:
+        times, frames, on_offs = np.loadtxt(fobj, delimiter='\t', usecols=(0, 1, 2),
+                                            dtype=SYNC_DTYPE, ndmin=1, unpack=True)
 
-            line = line.replace('\r', '')
-            tokens = line[:-1].split('\t')
-
-            # This is one possibility of what it looks like: EEGlog file
-            task.sync_behavioral['time'].append(tokens[0])
-            task.sync_behavioral['frame'].append(tokens[1])
-            task.sync_behavioral['on_off'].append(tokens[2])
+    task.sync_behavioral['time'] = times
+    task.sync_behavioral['frame'] = frames
+    task.sync_behavioral['on_off'] = on_offs
 
     return task
+
+
+###################################################################################################
+## EVENT HANDLERS
+
+def _handle_things(tokens, task, flags):
+    """Parse information from a line with a 'THINGS' event.
+
+    Parameters
+    ----------
+    tokens : list of str
+        The tab-separated values of the line, as [time, frame, event, subevent, (rest)],
+        where any remaining columns are kept unsplit, in a single string, as the last element.
+    task : Task
+        Task object to collect information into.
+    flags : dict
+        Flags for tracking current status of the task.
+    """
+
+    time, frame, event, subevent = tokens[:4]
+
+    # If the event has further columns, they can be split out from the remainder
+    # values = tokens[4].split('\t')
+
+    ## ------ WORDS WORDS WORDS ------
+    ...
+
+
+# Map each event to the handler for that event - ADD ANY EXTRA EVENTS NEEDED
+EVENT_HANDLERS = {
+    'THINGS' : _handle_things,
+}
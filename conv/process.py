@@ -54,7 +54,8 @@ def process_time_info(task):
 
     ...
 
-    # Convert all time fields to be float values
+    # Convert all time fields to be float arrays
+    #   Doing so here means later time updates (e.g. offsets, unit changes) are vectorized
     task.update_time(convert_to_array, skip='session', dtype=float)
     task.convert_type('session', ['start_time', 'end_time'], float)
 
@@ -3,6 +3,8 @@
 import numpy as np
 
 from pynwb import NWBFile, TimeSeries, ProcessingModule
+from pynwb.core import VectorData
+from pynwb.epoch import TimeIntervals
 from pynwb.file import Subject, Units
 from pynwb.behavior import Position
 from pynwb.ecephys import ElectricalSeries
@@ -12,8 +14,9 @@ import sys
 sys.path.append('..')
 from conv import Paths, Electrodes
 from conv.io import (get_files, make_session_name, load_config,
-                     load_task_object, open_h5file, save_nwbfile)
+                     load_task_object, load_units, open_h5file, save_nwbfile)
 from conv.utils import print_status, get_current_date, convert_time_to_date
+from conv.measures import compute_speed
 
 # Import settings (from local folder)
 from settings import PROJECT_PATH, SESSION, SETTINGS
@@ -27,8 +30,9 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
     # Initialize paths
     paths = Paths(PROJECT_PATH, SESSION['SUBJECT'], SESSION['EXPERIMENT'], SESSION['SESSION'])
 
-    # Define the session name
-    session_name = make_session_name(SESSION['SUBJECT'], SESSION['EXPERIMENT'], SESSION['SESSION'])
+    # Define the session name, if not already given
+    session_name = SESSION.get('SESSION_NAME') or \
+        make_session_name(SESSION['SUBJECT'], SESSION['EXPERIMENT'], SESSION['SESSION'])
 
     print_status(SETTINGS['VERBOSE'], '\nCONVERTING XX DATA\n', 0)
     print_status(SETTINGS['VERBOSE'], 'Converting data for: \t{}'.format(session_name), 0)
@@ -62,7 +66,8 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
     # Get the list of available LFP files
     if SETTINGS['ADD_LFP']:
 
-        lfp_files = get_files(paths.micro_lfp, ext='.p')
+        # Sort files by name, so they are read in a consistent order
+        lfp_files = sorted(get_files(paths.micro_lfp, ext='.p'))
         assert lfp_files
 
     ## SETUP
@@ -81,7 +86,7 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
 
     if SETTINGS['CHANGE_TIME_UNIT']:
 
-        # Convert timestamp units, from milliseconds to seconds
+        # Convert timestamp units, from milliseconds (TIME_UNIT) to seconds
         task.update_time('change_units', value=1000, operation='divide')
 
     if SETTINGS['RESET_TIME']:
@@ -172,20 +177,29 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
 
     ## BEHAVIOURAL DATA
 
-    # Add event definitions
-    for event, description in metadata['trial'].items():
-        nwbfile.add_trial_column(event, description)
-
-    # Add event information to NWB file
-    for t_ind in range(len(task.trial['trial'])):
-
-        # Add trial information to file
-        try:
-            nwbfile.add_trial(start_time=task...,
-                              ...,
-                              stop_time=task...)
-        except IndexError:
-            print_status(SETTINGS['VERBOSE'], 'Incomplete last trial - skipped adding.', 1)
+    # Get the number of complete trials, dropping any incomplete last trial
+    n_trials = min(len(task.trial['trial']), len(task...))
+    if n_trials < len(task.trial['trial']):
+        print_status(SETTINGS['VERBOSE'], 'Incomplete last trial - skipped adding.', 1)
+
+    # Collect trial information together, as columns
+    trial_data = {'start_time' : task...[:n_trials],
+                  ...,
+                  'stop_time' : task...[:n_trials]}
+
+    # Define the trial columns, with event definitions from the metadata
+    descriptions = {'start_time' : 'Start time of the trial.',
+                    'stop_time' : 'Stop time of the trial.',
+                    **metadata['trial']}
+    assert set(trial_data) == set(descriptions), \
+        'Trial data does not match the trial metadata definitions.'
+
+    # Add trial information to NWB file
+    nwbfile.trials = TimeIntervals(name='trials',
+                                   description='experimental trials',
+                                   columns=[VectorData(name=name, description=description,
+                                                       data=trial_data[name])
+                                            for name, description in descriptions.items()])
 
     ## POSITION DATA
 
@@ -215,9 +229,10 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
     nwbfile.add_acquisition(boundaries)
 
     # Set position data as a spatial series and add to NWB file
+    player_position = np.vstack([task.position['x'], task.position['z']])
     position = Position(name='position')
     position.create_spatial_series(name='player_position',
-                                   data=np.vstack([task.position['x'], task.position['z']]),
+                                   data=player_position,
                                    unit='virtual units',
                                    timestamps=task.position['time'],
                                    reference_frame='middle',
@@ -234,10 +249,16 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
                                          description=metadata['position']['head_direction'])
     nwbfile.add_acquisition(head_direction)
 
+    # Compute speed from position, after any time updates, so it matches the timestamps
+    #   Speed is always derived here - any speed values set during processing are replaced
+    task.position['speed'] = compute_speed(player_position, task.position['time'])
+    speed_unit = 'virtual units / ' + \
+        ('second' if SETTINGS['CHANGE_TIME_UNIT'] else SETTINGS['TIME_UNIT'])
+
     # Create time series for speed & linear position
     speed = TimeSeries(name='speed',
                        data=task.position['speed'],
-                       unit='virtual units / second',
+                       unit=speed_unit,
                        timestamps=task.position['time'],
                        description=metadata['position']['speed'])
 
@@ -273,7 +294,10 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
                 spike_times = spike_times - task.info['time_offset']
 
             if SETTINGS['DROP_BEFORE_TASK']:
-                spike_times = spike_times[spike_times >= task.session['start_time']]
+                # Sort spike times if needed, then find the first spike at or after the start time
+                if np.any(np.diff(spike_times) < 0):
+                    spike_times = np.sort(spike_times)
+                spike_times = spike_times[np.searchsorted(spike_times, task.session['start_time']):]
 
             nwbfile.add_unit(id=ind,
                              electrodes=[0],
@@ -291,7 +315,7 @@ def convert_data(SESSION=SESSION, SETTINGS=SETTINGS):
 
         # Add each LFP trace as a new object
         for ind, lfp_file in enumerate(lfp_files):
-            with open(paths.lfp / lfp_file, 'rb') as pfile:
+            with open(paths.lfp / lfp_file, 'rb', buffering=65536) as pfile:
 
                 # Load ephys data
                 ephys_data = load(...)
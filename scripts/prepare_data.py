@@ -19,8 +19,9 @@ def prepare_data(SESSION=SESSION, SETTINGS=SETTINGS):
     # Initialize paths
     paths = Paths(PROJECT_PATH, SESSION['SUBJECT'], SESSION['EXPERIMENT'], SESSION['SESSION'])
 
-    # Define the session name
-    session_name = make_session_name(SESSION['SUBJECT'], SESSION['EXPERIMENT'], SESSION['SESSION'])
+    # Define the session name, if not already given
+    session_name = SESSION.get('SESSION_NAME') or \
+        make_session_name(SESSION['SUBJECT'], SESSION['EXPERIMENT'], SESSION['SESSION'])
 
     print_status(SETTINGS['VERBOSE'], '\nPREPARING XX DATA\n', 0)
     print_status(SETTINGS['VERBOSE'], 'Preparing data for {}'.format(session_name), 0)
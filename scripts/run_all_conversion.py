@@ -1,5 +1,7 @@
 """Run conversion on all sessions."""
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import sys
 sys.path.append('..')
 from conv import Paths
@@ -16,6 +18,24 @@ from settings import PROJECT_PATH, EXPERIMENT, SETTINGS, GROUP, SKIP
 ###################################################################################################
 ###################################################################################################
 
+def run_conversion(SESSION):
+    """Run data preparation & NWB conversion on a single session."""
+
+    try:
+
+        # Prepare data
+        prepare_data(SESSION=SESSION, SETTINGS=SETTINGS)
+
+        # Run data conversion
+        convert_data(SESSION=SESSION, SETTINGS=SETTINGS)
+
+    except Exception as excp:
+
+        catch_error(GROUP['CONTINUE_ON_FAIL'], SESSION['SESSION_NAME'],
+                    Paths(PROJECT_PATH).nwb / 'zFailed',
+                    SETTINGS['VERBOSE'], 'ISSUE CONVERTING SESSION: \t{}')
+
+
 def run_all_conversions():
     """Run NWB conversion on all available TH sessions."""
 
@@ -32,24 +52,29 @@ def run_all_conversions():
         all_sessions[subject] = get_files(paths.recordings / subject / EXPERIMENT, select='session')
 
     # Get a list of already converted sessions
-    converted = get_files(paths.nwb, select='nwb')
+    converted = frozenset(get_files(paths.nwb, select='nwb'))
+
+    # Collect the subjects & sessions to skip as sets, for membership checks
+    skip_subjects = frozenset(SKIP['SUBJECTS'])
+    skip_sessions = frozenset(SKIP['SESSIONS'])
 
+    # Collect the list of sessions to run
+    run_sessions = []
     for subject, sessions in all_sessions.items():
 
-        if subject in SKIP['SUBJECTS']:
+        if subject in skip_subjects:
             print_status(SETTINGS['VERBOSE'], 'SKIPPING SUBJECT: \t{}'.format(subject), 0)
             continue
 
         for session in sessions:
 
             # Collect together the subject information & define session ID
-            SESSION = {'SUBJECT' : subject, 'EXPERIMENT' : EXPERIMENT, 'SESSION' : session}
-            session_name = make_session_name(SESSION['SUBJECT'],
-                                             SESSION['EXPERIMENT'],
-                                             SESSION['SESSION'])
+            session_name = make_session_name(subject, EXPERIMENT, session)
+            SESSION = {'SUBJECT' : subject, 'EXPERIMENT' : EXPERIMENT, 'SESSION' : session,
+                       'SESSION_NAME' : session_name}
 
             # Check for skipping subject
-            if session_name in SKIP['SESSIONS']:
+            if session_name in skip_sessions:
                 print_status(SETTINGS['VERBOSE'], 'SKIPPING SESSION: \t{}'.format(session_name), 0)
                 continue
 
@@ -58,18 +83,25 @@ def run_all_conversions():
                 print_status(SETTINGS['VERBOSE'], 'SESSION ALREADY RUN: \t{}'.format(session_name), 0)
                 continue
 
-            try:
-
-                # Prepare data
-                prepare_data(SESSION=SESSION, SETTINGS=SETTINGS)
+            run_sessions.append(SESSION)
 
-                # Run data conversion
-                convert_data(SESSION=SESSION, SETTINGS=SETTINGS)
+    # Run conversions, serially or with independent sessions run in parallel across processes
+    if GROUP['N_JOBS'] == 1:
+        for SESSION in run_sessions:
+            run_conversion(SESSION)
 
-            except Exception as excp:
+    else:
+        with ProcessPoolExecutor(max_workers=GROUP['N_JOBS']) as executor:
+            futures = [executor.submit(run_conversion, SESSION) for SESSION in run_sessions]
 
-                catch_error(GROUP['CONTINUE_ON_FAIL'], session_name, paths.nwb / 'zFailed',
-                            SETTINGS['VERBOSE'], 'ISSUE CONVERTING SESSION: \t{}')
+            # Check for errors as sessions finish, cancelling pending sessions on a failure
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
 
     msg = '\n\n FINISHED CONVERSIONS FOR - {}\n\n'.format(EXPERIMENT)
     print_status(SETTINGS['VERBOSE'], msg, 0)
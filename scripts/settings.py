@@ -42,6 +42,8 @@ ADD_UNITS = True
 ADD_LFP = False
 
 # Time related settings
+#   TIME_UNIT is the unit of the raw log timestamps, which CHANGE_TIME_UNIT converts to seconds
+TIME_UNIT = 'millisecond'
 RESET_TIME = True
 CHANGE_TIME_UNIT = True
 DROP_BEFORE_TASK = True
@@ -61,6 +63,7 @@ SETTINGS = {
 
     # Time related settings
     'RESET_TIME' : RESET_TIME,
+    'TIME_UNIT' : TIME_UNIT,
     'CHANGE_TIME_UNIT' : CHANGE_TIME_UNIT,
     'DROP_BEFORE_TASK' : DROP_BEFORE_TASK,
 }
@@ -71,10 +74,14 @@ SETTINGS = {
 SKIP_ALREADY_RUN = False
 CONTINUE_ON_FAIL = False
 
+# Number of sessions to run in parallel (1 runs serially, None uses all available cores)
+N_JOBS = 1
+
 GROUP = {
 
     'SKIP_ALREADY_RUN' : SKIP_ALREADY_RUN,
     'CONTINUE_ON_FAIL' : CONTINUE_ON_FAIL,
+    'N_JOBS' : N_JOBS,
 
 }
 